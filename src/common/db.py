@@ -1,5 +1,6 @@
 import os
 import boto3
+from uuid import uuid4
 from pydantic import BaseModel, PrivateAttr
 from typing import Any, Iterable, Callable, TypeVar
 from boto3.dynamodb.conditions import Key, Attr
@@ -8,6 +9,9 @@ from typing import TypeVar
 
 Model = TypeVar("Model", bound="BaseModel")
 
+# returned by DDB.get_version for items stored without a version attribute
+NO_VERSION = object()
+
 
 class IndexDescriptor:
     def __init__(self, partition_key: str, sort_key: str = None):
@@ -22,6 +26,7 @@ class TableDescriptor(BaseModel):
     name: str = None
     model: type[BaseModel] = None
     indexes: dict = None
+    version_attribute: str = None
     _table: Any = PrivateAttr(None)
 
     def describe_table(self, name: str, model: BaseModel, partition_key: str, sort_key: str=None):
@@ -36,6 +41,9 @@ class TableDescriptor(BaseModel):
             self.indexes = {}
         self.indexes[index_name] = IndexDescriptor(partition_key, sort_key)
 
+    def set_version(self, attribute: str):
+        self.version_attribute = attribute
+
     @property
     def table(self):
         if self._table is None:
@@ -82,12 +90,68 @@ class DDB:
             return model
         return decorator
 
-    def put_item(self, item: Model, **kwargs):
-        self.meta(item).table.put_item(Item=item.dict(), **kwargs)
-    
+    @classmethod
+    def versioned(cls, attribute='version') -> Callable:
+        """ Keeps a version token in `attribute`, renewed on every put_item/update_item.
+            The model must declare the field, e.g. `version: str | None = None`
+        """
+        def decorator(model: type[Model]) -> type[Model]:
+            assert attribute in model.model_fields, f'Missing version field `{attribute}` in {model}'
+            if not hasattr(model, '_META'):
+                model._META = TableDescriptor()
+            model._META.set_version(attribute)
+            return model
+        return decorator
+
+    @staticmethod
+    def new_version() -> str:
+        return uuid4().hex
+
+    @staticmethod
+    def _version_condition(attribute: str, expected_version: str, condition=None):
+        """ Only boto3 conditions (Attr/Key) can be combined with expected_version """
+        assert not isinstance(condition, str), 'String conditions are not supported with expected_version'
+        version_condition = Attr(attribute).eq(expected_version)
+        return version_condition if condition is None else condition & version_condition
+
+    def put_item(self, item: Model, *, expected_version: str = None, **kwargs):
+        """ expected_version: only write if the stored item still has that version,
+            raises ConditionalCheckFailedException otherwise.
+            Items stored without a version never match, write them once without
+            expected_version (or with Attr(version).not_exists()) first.
+        """
+        attribute = self.meta(item).version_attribute
+        if expected_version is not None:
+            assert attribute is not None, f'Model is not versioned: {type(item)}'
+        data = item.dict()
+        if attribute:
+            if expected_version is not None:
+                kwargs['ConditionExpression'] = self._version_condition(
+                    attribute, expected_version, kwargs.get('ConditionExpression'))
+            data[attribute] = self.new_version()
+        self.meta(item).table.put_item(Item=data, **kwargs)
+        if attribute:
+            setattr(item, attribute, data[attribute])
+
     def get_item(self, model: type[Model], **key) -> Model:
         raw = self.meta(model).table.get_item(Key=key)
         return model(**raw['Item']) if 'Item' in raw else None
+
+    def get_version(self, model: type[Model], **key) -> str | object | None:
+        """ Reads only the version attribute, None if the item does not exist.
+            Returns NO_VERSION if the item exists but has no version yet,
+            callers should fall back to a full get_item in that case.
+        """
+        attribute = self.meta(model).version_attribute
+        assert attribute is not None, f'Model is not versioned: {model}'
+        raw = self.meta(model).table.get_item(
+            Key=key,
+            ProjectionExpression='#version',
+            ExpressionAttributeNames={'#version': attribute},
+        )
+        if 'Item' not in raw:
+            return None
+        return raw['Item'].get(attribute, NO_VERSION)
     
     def delete_item(self, item: Model):
         index = self.meta(item).indexes[None]
@@ -96,17 +160,24 @@ class DDB:
 
     def batch_write_item(self, items: list[Model]):
         batches = {}
+        versions = []
         for item in items:
             meta = self.meta(item)
             if meta.table_name not in batches:
                 batches[meta.table_name] = []
-            batches[meta.table_name].append(item)
+            data = item.dict()
+            if meta.version_attribute:
+                data[meta.version_attribute] = self.new_version()
+                versions.append((item, meta.version_attribute, data[meta.version_attribute]))
+            batches[meta.table_name].append(data)
         for name, data in batches.items():
             self.client.batch_write_item(
                 RequestItems={name: [
-                    {'PutRequest': {'Item': item.dict()}} for item in data
+                    {'PutRequest': {'Item': raw}} for raw in data
                 ]}
             )
+        for item, attribute, version in versions:
+            setattr(item, attribute, version)
 
     def batch_get_item(self, model: type[Model], keys: list[dict]) -> list[Model]:
         table_name = self.meta(model).table_name
@@ -120,9 +191,22 @@ class DDB:
                 yield model(**item)
             keys = response.get('UnprocessedKeys', {}).get('Keys', [])
 
-    def update_item(self, item: Model, values: dict, **kwargs) -> Model:
+    def update_item(self, item: Model, values: dict, *, expected_version: str = None, **kwargs) -> Model:
+        """ expected_version: only update if the stored item still has that version,
+            raises ConditionalCheckFailedException otherwise.
+            Items stored without a version never match, write them once without
+            expected_version (or with Attr(version).not_exists()) first.
+        """
         index = self.meta(item).indexes[None]
         key = index.get_key(item)
+        attribute = self.meta(item).version_attribute
+        if expected_version is not None:
+            assert attribute is not None, f'Model is not versioned: {type(item)}'
+        if attribute:
+            values = {**values, attribute: self.new_version()}
+            if expected_version is not None:
+                kwargs['condition_expression'] = self._version_condition(
+                    attribute, expected_version, kwargs.get('condition_expression'))
         query_expressions = []
         query_values = {}
         query_names = {}
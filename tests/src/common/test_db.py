@@ -0,0 +1,138 @@
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Attr
+from pydantic import BaseModel
+from shared.db import DDB, NO_VERSION
+from tests.test_utils import ModelTestCase
+
+
+@DDB.versioned()
+@DDB.table('documents', partition_key='id')
+class Document(BaseModel):
+    id: str
+    text: str
+    version: str | None = None
+
+
+@DDB.table('notes', partition_key='id')
+class Note(BaseModel):
+    id: str
+    text: str
+
+
+class TestVersionedModel(ModelTestCase):
+    models = {
+        Document: [],
+    }
+
+    def assertConditionFailed(self, error: ClientError):
+        assert error.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+    def test_put_item(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+        first = document.version
+        assert first is not None
+        assert DDB().get_item(Document, id='1').version == first
+
+        DDB().put_item(document, expected_version=first)
+        assert document.version != first
+        assert DDB().get_item(Document, id='1').version == document.version
+
+    def test_put_item_stale(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+        current = document.version
+
+        document.text = 'second'
+        with self.assertRaises(ClientError) as error:
+            DDB().put_item(document, expected_version='stale')
+        self.assertConditionFailed(error.exception)
+        assert document.version == current
+        stored = DDB().get_item(Document, id='1')
+        assert stored.text == 'first'
+        assert stored.version == current
+
+    def test_update_item(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+        first = document.version
+
+        DDB().update_item(document, {'text': 'second'}, expected_version=first)
+        assert document.text == 'second'
+        assert document.version != first
+        assert DDB().get_item(Document, id='1').version == document.version
+
+    def test_update_item_stale(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+        current = document.version
+
+        with self.assertRaises(ClientError) as error:
+            DDB().update_item(document, {'text': 'second'}, expected_version='stale')
+        self.assertConditionFailed(error.exception)
+        assert document.version == current
+        stored = DDB().get_item(Document, id='1')
+        assert stored.text == 'first'
+        assert stored.version == current
+
+    def test_update_item_with_condition(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+
+        with self.assertRaises(ClientError) as error:
+            DDB().update_item(document, {'text': 'second'}, expected_version=document.version,
+                              condition_expression=Attr('text').eq('other'))
+        self.assertConditionFailed(error.exception)
+
+        DDB().update_item(document, {'text': 'second'}, expected_version=document.version,
+                          condition_expression=Attr('text').eq('first'))
+        assert DDB().get_item(Document, id='1').text == 'second'
+
+    def test_string_condition(self):
+        document = Document(id='1', text='first')
+        with self.assertRaises(AssertionError):
+            DDB().put_item(document, expected_version='any', ConditionExpression='attribute_exists(id)')
+
+    def test_batch_write_item(self):
+        document = Document(id='1', text='first', version='old')
+        DDB().batch_write_item([document])
+        assert document.version != 'old'
+        assert DDB().get_version(Document, id='1') == document.version
+
+    def test_get_version(self):
+        document = Document(id='1', text='first')
+        DDB().put_item(document)
+        assert DDB().get_version(Document, id='1') == document.version
+        assert DDB().get_version(Document, id='2') is None
+
+        table = DDB.meta(Document).table
+        with patch.object(table, 'get_item', wraps=table.get_item) as get_item:
+            DDB().get_version(Document, id='1')
+        get_item.assert_called_once_with(
+            Key={'id': '1'},
+            ProjectionExpression='#version',
+            ExpressionAttributeNames={'#version': 'version'},
+        )
+
+    def test_get_version_unversioned(self):
+        DDB.meta(Document).table.put_item(Item={'id': '1', 'text': 'legacy'})
+        assert DDB().get_version(Document, id='1') is NO_VERSION
+
+
+class TestUnversionedModel(ModelTestCase):
+    models = {
+        Note: [Note(id='1', text='first')],
+    }
+
+    def test_expected_version(self):
+        note = Note(id='1', text='second')
+        with self.assertRaises(AssertionError):
+            DDB().put_item(note, expected_version='any')
+        with self.assertRaises(AssertionError):
+            DDB().update_item(note, {'text': 'second'}, expected_version='any')
+        assert DDB().get_item(Note, id='1').text == 'first'
+
+    def test_missing_version_field(self):
+        with self.assertRaises(AssertionError):
+            DDB.versioned()(Note)